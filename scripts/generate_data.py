@@ -9,224 +9,280 @@ This script produces five CSV files under the local `data/` directory:
  - reviews.csv
 
 Use: `python generate_data.py`
+
+`generate_tables()` returns the same tables in memory; `ingest_sqlite.py --direct`
+uses it to skip the CSV round-trip.
 """
 
 from __future__ import annotations
 
-import random
-from datetime import date, datetime, timedelta
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+try:  # optional: multithreaded C++ CSV writer
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
 RANDOM_SEED = 42
 NUM_PRODUCTS = 50
 NUM_CUSTOMERS = 100
 NUM_ORDERS = 500
 MAX_ITEMS_PER_ORDER = 5
 REVIEW_PROBABILITY = 0.6  # 60% of orders receive at least one review
+ORDER_SHARD_SIZE = 100_000  # orders per item-generation shard; more than one shard fans out to processes
+CSV_BATCH_ROWS = 250_000  # rows formatted at a time when streaming order_items.csv
 
+# Choice tables, materialized once as arrays so creators can gather from them by index
+CATEGORIES = np.asarray(
+    ["Electronics", "Home", "Outdoors", "Sports", "Beauty", "Automotive", "Toys", "Fashion", "Books", "Grocery"]
+)
+ADJECTIVES = np.asarray(
+    ["Premium", "Compact", "Eco", "Smart", "Classic", "Deluxe", "Lightweight", "Portable", "Advanced", "Essential"]
+)
+NOUNS = np.asarray(
+    ["Speaker", "Backpack", "Bottle", "Lamp", "Watch", "Camera", "Shoes", "Notebook", "Headphones", "Mixer"]
+)
+FIRST_NAMES = np.asarray(
+    ["Alex", "Jordan", "Taylor", "Casey", "Morgan", "Riley", "Harper", "Dakota", "Emerson", "Hayden"]
+)
+LAST_NAMES = np.asarray(["Smith", "Lee", "Garcia", "Patel", "Brown", "Chen", "Davis", "Martinez", "Lopez", "Wilson"])
+CITIES = np.asarray(
+    ["New York", "San Francisco", "Chicago", "Austin", "Seattle", "Boston", "Atlanta", "Denver", "Miami", "Phoenix"]
+)
+STATES = np.asarray(["NY", "CA", "IL", "TX", "WA", "MA", "GA", "CO", "FL", "AZ"])
+LOYALTY_TIERS = np.asarray(["Bronze", "Silver", "Gold", "Platinum"])
+ORDER_STATUSES = np.asarray(["pending", "processing", "completed", "shipped", "cancelled"])
+ORDER_STATUS_WEIGHTS = [0.05, 0.2, 0.4, 0.3, 0.05]
+SHIPPING_METHODS = np.asarray(["ground", "express", "pickup"])
+REVIEW_TEXTS = np.asarray(
+    [
+        "Great quality and fast shipping.",
+        "Decent product for the price.",
+        "Exceeded expectations!",
+        "Not satisfied with the durability.",
+        "Would definitely recommend to friends.",
+    ]
+)
 
-def random_date(start: date, end: date) -> datetime:
-    """Return a random datetime between start and end dates."""
-    delta_days = (end - start).days
-    random_days = random.randint(0, delta_days)
-    # random hour/minute to vary within the day
-    random_seconds = random.randint(0, 86399)
-    return datetime.combine(start + timedelta(days=random_days), datetime.min.time()) + timedelta(
-        seconds=random_seconds
-    )
 
+def random_timestamps(rng: np.random.Generator, start: date, end: date, size: int) -> pd.DatetimeIndex:
+    """Return `size` random timestamps between the start of `start` and the end of `end`."""
+    start_epoch = int(pd.Timestamp(start).timestamp())
+    span_seconds = ((end - start).days + 1) * 86400
+    return pd.to_datetime(start_epoch + rng.integers(0, span_seconds, size), unit="s")
 
-def create_products() -> pd.DataFrame:
-    categories = [
-        "Electronics",
-        "Home",
-        "Outdoors",
-        "Sports",
-        "Beauty",
-        "Automotive",
-        "Toys",
-        "Fashion",
-        "Books",
-        "Grocery",
-    ]
-    adjectives = [
-        "Premium",
-        "Compact",
-        "Eco",
-        "Smart",
-        "Classic",
-        "Deluxe",
-        "Lightweight",
-        "Portable",
-        "Advanced",
-        "Essential",
-    ]
-    nouns = [
-        "Speaker",
-        "Backpack",
-        "Bottle",
-        "Lamp",
-        "Watch",
-        "Camera",
-        "Shoes",
-        "Notebook",
-        "Headphones",
-        "Mixer",
-    ]
 
-    rows = []
-    for product_id in range(1, NUM_PRODUCTS + 1):
-        category = random.choice(categories)
-        name = f"{random.choice(adjectives)} {random.choice(nouns)}"
-        cost = round(random.uniform(5, 80), 2)
-        price = round(cost * random.uniform(1.2, 2.5), 2)
-        rows.append(
-            {
-                "product_id": product_id,
-                "name": name,
-                "category": category,
-                "price": price,
-                "cost": cost,
-                "active": random.choice([True, True, True, False]),  # mostly active
-            }
-        )
-    return pd.DataFrame(rows)
-
-
-def create_customers() -> pd.DataFrame:
-    first_names = ["Alex", "Jordan", "Taylor", "Casey", "Morgan", "Riley", "Harper", "Dakota", "Emerson", "Hayden"]
-    last_names = ["Smith", "Lee", "Garcia", "Patel", "Brown", "Chen", "Davis", "Martinez", "Lopez", "Wilson"]
-    cities = ["New York", "San Francisco", "Chicago", "Austin", "Seattle", "Boston", "Atlanta", "Denver", "Miami", "Phoenix"]
-    states = ["NY", "CA", "IL", "TX", "WA", "MA", "GA", "CO", "FL", "AZ"]
+def create_products(rng: np.random.Generator) -> pd.DataFrame:
+    category = CATEGORIES[rng.integers(0, CATEGORIES.size, NUM_PRODUCTS)]
+    adjective = ADJECTIVES[rng.integers(0, ADJECTIVES.size, NUM_PRODUCTS)]
+    noun = NOUNS[rng.integers(0, NOUNS.size, NUM_PRODUCTS)]
+    cost = np.round(rng.uniform(5, 80, NUM_PRODUCTS), 2)
+    price = np.round(cost * rng.uniform(1.2, 2.5, NUM_PRODUCTS), 2)
+    return pd.DataFrame(
+        {
+            "product_id": np.arange(1, NUM_PRODUCTS + 1),
+            "name": np.char.add(np.char.add(adjective, " "), noun),
+            "category": category,
+            "price": price,
+            "cost": cost,
+            "active": rng.random(NUM_PRODUCTS) < 0.75,  # mostly active
+        }
+    )
+
+
+def create_customers(rng: np.random.Generator) -> pd.DataFrame:
     base_date = date.today() - timedelta(days=365)
 
-    rows = []
-    for customer_id in range(1, NUM_CUSTOMERS + 1):
-        first = random.choice(first_names)
-        last = random.choice(last_names)
-        signup = random_date(base_date, date.today())
-        rows.append(
-            {
-                "customer_id": customer_id,
-                "first_name": first,
-                "last_name": last,
-                "email": f"{first.lower()}.{last.lower()}{customer_id}@example.com",
-                "city": random.choice(cities),
-                "state": random.choice(states),
-                "signup_date": signup.date().isoformat(),
-                "loyalty_tier": random.choice(["Bronze", "Silver", "Gold", "Platinum"]),
-            }
-        )
-    return pd.DataFrame(rows)
-
-
-def create_orders(customers: pd.DataFrame) -> pd.DataFrame:
-    statuses = ["pending", "processing", "completed", "shipped", "cancelled"]
+    customer_id = np.arange(1, NUM_CUSTOMERS + 1)
+    first = FIRST_NAMES[rng.integers(0, FIRST_NAMES.size, NUM_CUSTOMERS)]
+    last = LAST_NAMES[rng.integers(0, LAST_NAMES.size, NUM_CUSTOMERS)]
+    email = (
+        pd.Series(first).str.lower()
+        + "."
+        + pd.Series(last).str.lower()
+        + pd.Series(customer_id).astype(str)
+        + "@example.com"
+    )
+    signup = random_timestamps(rng, base_date, date.today(), NUM_CUSTOMERS)
+    return pd.DataFrame(
+        {
+            "customer_id": customer_id,
+            "first_name": first,
+            "last_name": last,
+            "email": email,
+            "city": CITIES[rng.integers(0, CITIES.size, NUM_CUSTOMERS)],
+            "state": STATES[rng.integers(0, STATES.size, NUM_CUSTOMERS)],
+            "signup_date": signup.strftime("%Y-%m-%d"),
+            "loyalty_tier": LOYALTY_TIERS[rng.integers(0, LOYALTY_TIERS.size, NUM_CUSTOMERS)],
+        }
+    )
+
+
+def create_orders(customers: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
     start_date = date.today() - timedelta(days=180)
-    rows = []
-    for order_id in range(1, NUM_ORDERS + 1):
-        customer_id = int(customers.sample(1)["customer_id"].iloc[0])
-        order_dt = random_date(start_date, date.today())
-        status = random.choices(statuses, weights=[0.05, 0.2, 0.4, 0.3, 0.05])[0]
-        rows.append(
-            {
-                "order_id": order_id,
-                "customer_id": customer_id,
-                "order_date": order_dt.isoformat(sep=" "),
-                "order_status": status,
-                "shipping_method": random.choice(["ground", "express", "pickup"]),
-                "order_total": 0.0,  # placeholder, filled after items are generated
-            }
-        )
-    return pd.DataFrame(rows)
-
-
-def create_order_items(orders: pd.DataFrame, products: pd.DataFrame) -> pd.DataFrame:
-    rows = []
-    order_totals = {}
-    item_id = 1
-
-    for _, order in orders.iterrows():
-        num_items = random.randint(1, MAX_ITEMS_PER_ORDER)
-        product_choices = products.sample(num_items, replace=True)
-        order_total = 0.0
-        for _, product in product_choices.iterrows():
-            quantity = random.randint(1, 4)
-            unit_price = float(product["price"])
-            line_total = round(unit_price * quantity, 2)
-            rows.append(
-                {
-                    "order_item_id": item_id,
-                    "order_id": int(order["order_id"]),
-                    "product_id": int(product["product_id"]),
-                    "quantity": quantity,
-                    "unit_price": unit_price,
-                    "line_total": line_total,
-                }
-            )
-            order_total += line_total
-            item_id += 1
-        order_totals[int(order["order_id"])] = round(order_total, 2)
-
-    orders["order_total"] = orders["order_id"].map(order_totals).fillna(0.0)
-    return pd.DataFrame(rows)
-
-
-def create_reviews(orders: pd.DataFrame, order_items: pd.DataFrame) -> pd.DataFrame:
-    review_rows = []
-    review_id = 1
+
+    customer_id = rng.choice(customers["customer_id"].to_numpy(), NUM_ORDERS, replace=True)
+    status = ORDER_STATUSES[rng.choice(ORDER_STATUSES.size, NUM_ORDERS, p=ORDER_STATUS_WEIGHTS)]
+    order_dt = random_timestamps(rng, start_date, date.today(), NUM_ORDERS)
+    return pd.DataFrame(
+        {
+            "order_id": np.arange(1, NUM_ORDERS + 1),
+            "customer_id": customer_id,
+            "order_date": order_dt.strftime("%Y-%m-%d %H:%M:%S"),
+            "order_status": status,
+            "shipping_method": SHIPPING_METHODS[rng.integers(0, SHIPPING_METHODS.size, NUM_ORDERS)],
+            "order_total": 0.0,  # placeholder, filled after items are generated
+        }
+    )
+
+
+def create_order_item_shard(
+    order_ids: np.ndarray, product_ids: np.ndarray, prices: np.ndarray, seed: int
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """Generate line items for one shard of orders; returns the items and each order's total."""
+    rng = np.random.default_rng(seed)
+    num_items = rng.integers(1, MAX_ITEMS_PER_ORDER + 1, len(order_ids))
+    # position of the owning order for every line item, in order
+    order_pos = np.repeat(np.arange(len(order_ids)), num_items)
+    total_items = int(num_items.sum())
+
+    product_pos = rng.integers(0, len(product_ids), total_items)
+    unit_price = prices[product_pos]
+    quantity = rng.integers(1, 5, total_items)
+    line_total = np.round(unit_price * quantity, 2)
+
+    order_totals = np.round(np.bincount(order_pos, weights=line_total, minlength=len(order_ids)), 2)
+    items = pd.DataFrame(
+        {
+            "order_id": order_ids[order_pos],
+            "product_id": product_ids[product_pos],
+            "quantity": quantity,
+            "unit_price": unit_price,
+            "line_total": line_total,
+        }
+    )
+    return items, order_totals
+
+
+def create_order_items(orders: pd.DataFrame, products: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    order_ids = orders["order_id"].to_numpy()
+    product_ids = products["product_id"].to_numpy()
+    prices = products["price"].to_numpy()
+    # Shards are seeded from one draw so the output does not depend on the worker count
+    seed = int(rng.integers(2**32))
+    shards = [
+        (order_ids[start : start + ORDER_SHARD_SIZE], product_ids, prices, seed + shard_index)
+        for shard_index, start in enumerate(range(0, len(order_ids), ORDER_SHARD_SIZE))
+    ]
+
+    if len(shards) > 1:
+        with multiprocessing.Pool(min(len(shards), os.cpu_count() or 1)) as pool:
+            results = pool.starmap(create_order_item_shard, shards)
+    else:
+        results = [create_order_item_shard(*shard) for shard in shards]
+
+    orders["order_total"] = np.concatenate([totals for _, totals in results])
+    order_items = pd.concat([items for items, _ in results], ignore_index=True)
+    order_items.insert(0, "order_item_id", np.arange(1, len(order_items) + 1))
+    return order_items
+
+
+def create_reviews(orders: pd.DataFrame, order_items: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
     start_date = date.today() - timedelta(days=180)
-    for _, order in orders.iterrows():
-        if random.random() > REVIEW_PROBABILITY:
-            continue
-
-        # Use the first product from the order for simplicity
-        order_id = int(order["order_id"])
-        items = order_items[order_items["order_id"] == order_id]
-        if items.empty:
-            continue
-        product_id = int(items.sample(1)["product_id"].iloc[0])
-        review_date = random_date(start_date, date.today()).isoformat(sep=" ")
-        review_rows.append(
-            {
-                "review_id": review_id,
-                "order_id": order_id,
-                "product_id": product_id,
-                "customer_id": int(order["customer_id"]),
-                "rating": random.randint(1, 5),
-                "review_date": review_date,
-                "review_text": random.choice(
-                    [
-                        "Great quality and fast shipping.",
-                        "Decent product for the price.",
-                        "Exceeded expectations!",
-                        "Not satisfied with the durability.",
-                        "Would definitely recommend to friends.",
-                    ]
-                ),
-            }
-        )
-        review_id += 1
-    return pd.DataFrame(review_rows)
 
+    # Pick one random product per order: shuffle the items, keep the first line of each order
+    shuffle = rng.permutation(len(order_items))
+    item_order_ids = order_items["order_id"].to_numpy()[shuffle]
+    item_product_ids = order_items["product_id"].to_numpy()[shuffle]
+    ordered_ids, first_line = np.unique(item_order_ids, return_index=True)
+
+    order_ids = orders["order_id"].to_numpy()
+    mask = (rng.random(len(orders)) < REVIEW_PROBABILITY) & np.isin(order_ids, ordered_ids)
+    review_order_ids = order_ids[mask]
+    num_reviews = review_order_ids.size
+
+    review_dt = random_timestamps(rng, start_date, date.today(), num_reviews)
+    return pd.DataFrame(
+        {
+            "review_id": np.arange(1, num_reviews + 1),
+            "order_id": review_order_ids,
+            "product_id": item_product_ids[first_line[np.searchsorted(ordered_ids, review_order_ids)]],
+            "customer_id": orders["customer_id"].to_numpy()[mask],
+            "rating": rng.integers(1, 6, num_reviews),
+            "review_date": review_dt.strftime("%Y-%m-%d %H:%M:%S"),
+            "review_text": REVIEW_TEXTS[rng.integers(0, REVIEW_TEXTS.size, num_reviews)],
+        }
+    )
 
-def main(output_dir: Path) -> None:
-    random.seed(RANDOM_SEED)
 
+def write_csv(df: pd.DataFrame, path: Path) -> None:
+    """Write a DataFrame to CSV, using pyarrow's writer when it is installed."""
+    if pa is None:
+        df.to_csv(path, index=False)
+        return
+    pacsv.write_csv(
+        pa.Table.from_pandas(df, preserve_index=False),
+        path,
+        write_options=pacsv.WriteOptions(include_header=True),
+    )
+
+
+def write_csv_rows(df: pd.DataFrame, path: Path) -> None:
+    """Stream a large DataFrame to CSV in batches, so only one batch is formatted in memory at a time."""
+    if pa is not None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pacsv.CSVWriter(path, table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=CSV_BATCH_ROWS):
+                writer.write_batch(batch)
+        return
+
+    with open(path, "w", newline="", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(df.columns)
+        for start in range(0, len(df), CSV_BATCH_ROWS):
+            batch = df.iloc[start : start + CSV_BATCH_ROWS]
+            writer.writerows(zip(*(batch[column].tolist() for column in batch.columns)))
+
+
+def generate_tables() -> dict[str, pd.DataFrame]:
+    """Generate all five tables in memory, keyed by table name in load order."""
+    rng = np.random.default_rng(RANDOM_SEED)
+
+    products = create_products(rng)
+    customers = create_customers(rng)
+    orders = create_orders(customers, rng)
+    order_items = create_order_items(orders, products, rng)
+    reviews = create_reviews(orders, order_items, rng)
+    return {
+        "products": products,
+        "customers": customers,
+        "orders": orders,
+        "order_items": order_items,
+        "reviews": reviews,
+    }
+
+
+def main(output_dir: Path) -> None:
     output_dir.mkdir(parents=True, exist_ok=True)
-    products = create_products()
-    customers = create_customers()
-    orders = create_orders(customers)
-    order_items = create_order_items(orders, products)
-    reviews = create_reviews(orders, order_items)
-
-    products.to_csv(output_dir / "products.csv", index=False)
-    customers.to_csv(output_dir / "customers.csv", index=False)
-    orders.to_csv(output_dir / "orders.csv", index=False)
-    order_items.to_csv(output_dir / "order_items.csv", index=False)
-    reviews.to_csv(output_dir / "reviews.csv", index=False)
+    tables = generate_tables()
+    # order_items is the largest table, so it is streamed in batches
+    writers = {"order_items": write_csv_rows}
+    # pyarrow releases the GIL while formatting, so the writes overlap
+    with ThreadPoolExecutor(len(tables)) as pool:
+        futures = [
+            pool.submit(writers.get(name, write_csv), df, output_dir / f"{name}.csv") for name, df in tables.items()
+        ]
+        for future in futures:
+            future.result()
     print(f"Generated data files in {output_dir}")
 
 
@@ -3,18 +3,24 @@ SQLite ingestion script for the synthetic e-commerce dataset.
 
 Assumes CSVs were generated with `generate_data.py` and placed under `data/`.
 Creates an `ecom.db` SQLite database, defines tables, and bulk loads the CSVs
-using pandas.
+with pandas and `executemany`. Re-running keeps the existing schema and replaces
+the rows in place.
 
 Use: `python ingest_sqlite.py`
+     `python ingest_sqlite.py --direct` to generate the data in-process and skip the CSVs
+     `python ingest_sqlite.py --reset` to delete the database file and start from scratch
 """
 
 from __future__ import annotations
 
+import argparse
 import sqlite3
 from pathlib import Path
 
 import pandas as pd
 
+from generate_data import generate_tables
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = PROJECT_ROOT / "data"
 DB_PATH = PROJECT_ROOT / "db" / "ecom.db"
@@ -27,21 +33,26 @@ def load_csv(name: str) -> pd.DataFrame:
     return pd.read_csv(path)
 
 
-def create_tables(conn: sqlite3.Connection) -> None:
-    """Drop and recreate tables with explicit typing."""
-    cursor = conn.cursor()
+def load_csvs() -> dict[str, pd.DataFrame]:
+    return {
+        "products": load_csv("products"),
+        "customers": load_csv("customers"),
+        "orders": load_csv("orders"),
+        "order_items": load_csv("order_items"),
+        "reviews": load_csv("reviews"),
+    }
 
-    cursor.executescript(
-        """
-        PRAGMA foreign_keys = ON;
 
-        DROP TABLE IF EXISTS reviews;
-        DROP TABLE IF EXISTS order_items;
-        DROP TABLE IF EXISTS orders;
-        DROP TABLE IF EXISTS products;
-        DROP TABLE IF EXISTS customers;
+def create_tables(conn: sqlite3.Connection) -> None:
+    """Create any missing tables (with explicit typing) and foreign-key indexes.
+
+    Statements are run one at a time rather than with executescript(), which
+    would commit the caller's open transaction first.
+    """
+    cursor = conn.cursor()
 
-        CREATE TABLE products (
+    schema = """
+        CREATE TABLE IF NOT EXISTS products (
             product_id INTEGER PRIMARY KEY,
             name TEXT NOT NULL,
             category TEXT NOT NULL,
@@ -50,7 +61,7 @@ def create_tables(conn: sqlite3.Connection) -> None:
             active INTEGER NOT NULL
         );
 
-        CREATE TABLE customers (
+        CREATE TABLE IF NOT EXISTS customers (
             customer_id INTEGER PRIMARY KEY,
             first_name TEXT NOT NULL,
             last_name TEXT NOT NULL,
@@ -61,7 +72,7 @@ def create_tables(conn: sqlite3.Connection) -> None:
             loyalty_tier TEXT NOT NULL
         );
 
-        CREATE TABLE orders (
+        CREATE TABLE IF NOT EXISTS orders (
             order_id INTEGER PRIMARY KEY,
             customer_id INTEGER NOT NULL,
             order_date TEXT NOT NULL,
@@ -71,7 +82,7 @@ def create_tables(conn: sqlite3.Connection) -> None:
             FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
         );
 
-        CREATE TABLE order_items (
+        CREATE TABLE IF NOT EXISTS order_items (
             order_item_id INTEGER PRIMARY KEY,
             order_id INTEGER NOT NULL,
             product_id INTEGER NOT NULL,
@@ -82,7 +93,7 @@ def create_tables(conn: sqlite3.Connection) -> None:
             FOREIGN KEY (product_id) REFERENCES products(product_id)
         );
 
-        CREATE TABLE reviews (
+        CREATE TABLE IF NOT EXISTS reviews (
             review_id INTEGER PRIMARY KEY,
             order_id INTEGER NOT NULL,
             product_id INTEGER NOT NULL,
@@ -94,41 +105,97 @@ def create_tables(conn: sqlite3.Connection) -> None:
             FOREIGN KEY (product_id) REFERENCES products(product_id),
             FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
         );
+
+        -- Foreign-key indexes for the joins in query_run.py / visualize_reports.py
+        CREATE INDEX IF NOT EXISTS idx_oi_order ON order_items(order_id);
+        CREATE INDEX IF NOT EXISTS idx_oi_product ON order_items(product_id);
+        CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id);
+        CREATE INDEX IF NOT EXISTS idx_reviews_order ON reviews(order_id);
         """
-    )
-    conn.commit()
+    for statement in schema.split(";"):
+        if statement.strip():
+            cursor.execute(statement)
 
 
-def bulk_insert(conn: sqlite3.Connection) -> None:
-    """Load each CSV via pandas and insert into SQLite."""
-    dataframes = {
-        "products": load_csv("products"),
-        "customers": load_csv("customers"),
-        "orders": load_csv("orders"),
-        "order_items": load_csv("order_items"),
-        "reviews": load_csv("reviews"),
-    }
+def clear_tables(conn: sqlite3.Connection) -> None:
+    """Delete all rows, children before parents so foreign keys stay satisfied."""
+    for table in ("reviews", "order_items", "orders", "customers", "products"):
+        conn.execute(f"DELETE FROM {table}")
+
 
+def bulk_insert(conn: sqlite3.Connection, dataframes: dict[str, pd.DataFrame]) -> None:
+    """Insert each DataFrame into the table of the same name with executemany."""
     for table, df in dataframes.items():
-        df.to_sql(table, conn, if_exists="append", index=False)
+        columns = ", ".join(df.columns)
+        placeholders = ", ".join(["?"] * df.shape[1])
+        conn.executemany(
+            f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+            df.itertuples(index=False, name=None),
+        )
         print(f"Inserted {len(df)} rows into {table}")
 
 
-def main() -> None:
-    if not DATA_DIR.exists():
+def main(direct: bool = False, reset: bool = False, vacuum_into: Path | None = None) -> None:
+    if not direct and not DATA_DIR.exists():
         raise FileNotFoundError(f"Data directory not found at {DATA_DIR}. Run generate_data.py first.")
+    dataframes = generate_tables() if direct else load_csvs()
 
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    if DB_PATH.exists():
+    if reset and DB_PATH.exists():
         DB_PATH.unlink()
         print(f"Existing database removed: {DB_PATH}")
 
     with sqlite3.connect(DB_PATH) as conn:
-        create_tables(conn)
-        bulk_insert(conn)
-        print(f"SQLite database created at {DB_PATH}")
+        # An in-memory journal keeps the reload atomic without writing a journal
+        # file, and fsyncs buy nothing for a rebuildable database.
+        # Pragmas cannot change inside a transaction, so set them up front.
+        conn.executescript(
+            """
+            PRAGMA foreign_keys = ON;
+            PRAGMA journal_mode = MEMORY;
+            PRAGMA synchronous = OFF;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA cache_size = -64000;
+            """
+        )
+        try:
+            with conn:  # schema, data and statistics commit as one transaction
+                conn.execute("BEGIN")
+                create_tables(conn)
+                clear_tables(conn)
+                bulk_insert(conn, dataframes)
+                conn.execute("ANALYZE")  # populate sqlite_stat1 for the query planner
+        finally:
+            conn.executescript(
+                """
+                PRAGMA journal_mode = DELETE;
+                PRAGMA synchronous = FULL;
+                """
+            )
+        print(f"SQLite database loaded at {DB_PATH}")
+
+        if vacuum_into is not None:
+            conn.execute("VACUUM INTO ?", (str(vacuum_into),))
+            print(f"Compacted copy written to {vacuum_into}")
 
 
 if __name__ == "__main__":
-    main()
-
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--direct",
+        action="store_true",
+        help="generate the data in-process and load it without writing or reading CSVs",
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="delete the database file and recreate the schema instead of reloading the existing tables",
+    )
+    parser.add_argument(
+        "--vacuum-into",
+        type=Path,
+        metavar="PATH",
+        help="after loading, write a compacted copy of the database to PATH (which must not exist)",
+    )
+    args = parser.parse_args()
+    main(direct=args.direct, reset=args.reset, vacuum_into=args.vacuum_into)
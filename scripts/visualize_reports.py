@@ -7,75 +7,76 @@ Generates bar charts for:
 
 Outputs a combined figure at `analysis/dashboards/charts.png`.
 
-Use: `python visualize_reports.py`
+Use: `python visualize_reports.py [--dpi 150]`
 """
 
 from __future__ import annotations
 
+import argparse
 import sqlite3
 from pathlib import Path
 
-import matplotlib.pyplot as plt
-import pandas as pd
+import matplotlib
+
+matplotlib.use("Agg")  # PNG output only; avoids loading a GUI toolkit at import time
+
+import matplotlib.pyplot as plt  # noqa: E402
+import pandas as pd  # noqa: E402
+
+plt.rcParams["path.simplify"] = True
+plt.rcParams["agg.path.chunksize"] = 10000
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DB_PATH = PROJECT_ROOT / "db" / "ecom.db"
 OUTPUT_PATH = PROJECT_ROOT / "analysis" / "dashboards" / "charts.png"
 
 
-def fetch_dataframe(query: str) -> pd.DataFrame:
-    if not DB_PATH.exists():
-        raise FileNotFoundError(f"SQLite database not found at {DB_PATH}. Run ingest_sqlite.py first.")
-    with sqlite3.connect(DB_PATH) as conn:
-        return pd.read_sql_query(query, conn)
+def fetch_dataframe(query: str, conn: sqlite3.Connection) -> pd.DataFrame:
+    return pd.read_sql_query(query, conn)
 
 
 def ensure_output_dir() -> None:
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 
-def plot_top_products(ax: plt.Axes) -> None:
-    df = fetch_dataframe(
+def fetch_product_sales(conn: sqlite3.Connection) -> pd.DataFrame:
+    """Per-product units and revenue; both charts are derived from this one result."""
+    return fetch_dataframe(
         """
         SELECT
             p.name AS product_name,
-            SUM(oi.quantity) AS units_sold
+            p.category,
+            SUM(oi.quantity) AS units_sold,
+            SUM(oi.line_total) AS revenue
         FROM products p
         JOIN order_items oi ON oi.product_id = p.product_id
-        GROUP BY p.product_id
-        ORDER BY units_sold DESC
-        LIMIT 10;
-        """
+        GROUP BY p.product_id;
+        """,
+        conn,
     )
-    if df.empty:
+
+
+def plot_top_products(ax: plt.Axes, sales: pd.DataFrame) -> None:
+    if sales.empty:
         ax.text(0.5, 0.5, "No data available", ha="center", va="center")
         ax.set_title("Top 10 Products by Units Sold")
         return
 
+    df = sales.nlargest(10, "units_sold")
     ax.barh(df["product_name"], df["units_sold"], color="#4C72B0")
     ax.invert_yaxis()
     ax.set_xlabel("Units Sold")
     ax.set_title("Top 10 Products by Units Sold")
 
 
-def plot_revenue_by_category(ax: plt.Axes) -> None:
-    df = fetch_dataframe(
-        """
-        SELECT
-            p.category,
-            SUM(oi.line_total) AS revenue
-        FROM products p
-        JOIN order_items oi ON oi.product_id = p.product_id
-        GROUP BY p.category
-        ORDER BY revenue DESC;
-        """
-    )
-    if df.empty:
+def plot_revenue_by_category(ax: plt.Axes, sales: pd.DataFrame) -> None:
+    if sales.empty:
         ax.text(0.5, 0.5, "No data available", ha="center", va="center")
         ax.set_title("Revenue by Category")
         return
 
-    ax.bar(df["category"], df["revenue"], color="#55A868")
+    revenue = sales.groupby("category")["revenue"].sum().sort_values(ascending=False)
+    ax.bar(revenue.index, revenue.to_numpy(), color="#55A868")
     ax.set_ylabel("Revenue ($)")
     ax.set_title("Revenue by Category")
     ax.tick_params(axis="x", labelrotation=45)
@@ -83,17 +84,31 @@ def plot_revenue_by_category(ax: plt.Axes) -> None:
         label.set_horizontalalignment("right")
 
 
-def main() -> None:
+def main(dpi: int = 150) -> None:
+    if not DB_PATH.exists():
+        raise FileNotFoundError(f"SQLite database not found at {DB_PATH}. Run ingest_sqlite.py first.")
+
     ensure_output_dir()
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-    plot_top_products(ax1)
-    plot_revenue_by_category(ax2)
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executescript(
+            """
+            PRAGMA mmap_size = 268435456;
+            PRAGMA cache_size = -64000;
+            """
+        )
+        sales = fetch_product_sales(conn)
+    plot_top_products(ax1, sales)
+    plot_revenue_by_category(ax2, sales)
     fig.tight_layout()
-    fig.savefig(OUTPUT_PATH, dpi=150)
+    fig.savefig(OUTPUT_PATH, dpi=dpi)
     plt.close(fig)
     print(f"Charts saved to {OUTPUT_PATH}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dpi", type=int, default=150, help="output resolution; lower it for quick drafts")
+    args = parser.parse_args()
+    main(dpi=args.dpi)
 